@@ -0,0 +1,56 @@
+"""PDF page extraction for the vectorizer.
+
+Kept separate from vectorize.py and free of heavy imports, so spawned
+extraction workers only need PyMuPDF to unpickle and run these functions.
+"""
+from typing import Iterator, List, Optional, Tuple
+
+import pymupdf
+
+# MuPDF reports recoverable syntax problems in malformed PDFs on stderr; they
+# do not affect extraction.
+pymupdf.TOOLS.mupdf_display_errors(False)
+
+# Large PDFs are split into page ranges of this size so their pages can be
+# extracted by several worker processes at once.
+PAGES_PER_TASK = 50
+
+def iter_pdf_pages(pdf_path: str, first_page: int = 0,
+                   last_page: Optional[int] = None) -> Iterator[str]:
+    """Yield the text of each non-empty PDF page, prefixed with a page marker."""
+    try:
+        with pymupdf.open(pdf_path) as doc:
+            for page in doc.pages(first_page, last_page):
+                page_text = page.get_text()
+                if not page_text.strip():
+                    continue
+                yield f"\n--- Page {page.number + 1} ---\n{page_text}"
+    except Exception as e:
+        print(f"Failed to extract text from {pdf_path}: {e}")
+
+def extract_pages_from_pdf(pdf_path: str, first_page: int = 0,
+                           last_page: Optional[int] = None) -> List[str]:
+    """Extract the page texts of a PDF file, optionally for a page range only.
+
+    Kept at module level so it can be shipped to worker processes.
+    """
+    return list(iter_pdf_pages(pdf_path, first_page, last_page))
+
+def page_count(pdf_path: str) -> Optional[int]:
+    """Return the number of pages in a PDF, or None if it cannot be opened."""
+    try:
+        with pymupdf.open(pdf_path) as doc:
+            return doc.page_count
+    except Exception:
+        return None
+
+def page_ranges(pages: Optional[int], pages_per_task: int = PAGES_PER_TASK) -> List[Tuple[int, Optional[int]]]:
+    """Split a document of the given page count into ranges to extract independently.
+
+    Always returns at least one range, so unreadable files (pages is None)
+    still produce a (failing) extraction task that reports the error.
+    """
+    if not pages:
+        return [(0, None)]
+    return [(first, min(first + pages_per_task, pages))
+            for first in range(0, pages, pages_per_task)]
@@ -0,0 +1,58 @@
+import pytest
+
+import vectorize
+from vectorize import DocumentVectorizer
+
+
+class ByteEncoding:
+    """One token per UTF-8 byte, so window boundaries are easy to reason about."""
+
+    def encode_ordinary(self, text):
+        return list(text.encode())
+
+    def decode_bytes(self, tokens):
+        return bytes(tokens)
+
+
+@pytest.fixture
+def vectorizer(monkeypatch):
+    monkeypatch.setattr(vectorize, "chunk_encoding", ByteEncoding)
+    return DocumentVectorizer("localhost")
+
+
+def test_empty_text_yields_nothing(vectorizer):
+    assert list(vectorizer.chunk_text("", chunk_size=10, overlap=3)) == []
+
+
+def test_exactly_chunk_size_is_one_chunk(vectorizer):
+    assert list(vectorizer.chunk_text("a" * 10, chunk_size=10, overlap=3)) == ["a" * 10]
+
+
+def test_one_past_chunk_size_adds_overlapping_tail(vectorizer):
+    text = "abcdefghijk"
+    assert list(vectorizer.chunk_text(text, chunk_size=10, overlap=3)) == ["abcdefghij", "hijk"]
+
+
+def test_final_window_starts_overlap_before_previous_end(vectorizer):
+    text = "abcdefghijklmnopq"
+    assert list(vectorizer.chunk_text(text, chunk_size=10, overlap=3)) == ["abcdefghij", "hijklmnopq"]
+
+
+def test_characters_split_at_window_edges_are_dropped(vectorizer):
+    # Two bytes per character: the first window ends on a character boundary,
+    # the second starts halfway through one.
+    text = "é" * 15
+    assert list(vectorizer.chunk_text(text, chunk_size=20, overlap=5)) == ["é" * 10, "é" * 7]
+
+
+def test_streamed_pages_match_joined_text(vectorizer):
+    pages = ["\n--- Page 1 ---\nalpha beta ", "gamma", "", "\n--- Page 3 ---\ndelta épsilon " * 4]
+    streamed = list(vectorizer.chunk_text(iter(pages), chunk_size=16, overlap=4))
+    joined = list(vectorizer.chunk_text("".join(pages), chunk_size=16, overlap=4))
+    assert streamed == joined
+
+
+@pytest.mark.parametrize("chunk_size, overlap", [(0, 0), (10, 10), (10, 12), (10, -1)])
+def test_invalid_sizes_raise(vectorizer, chunk_size, overlap):
+    with pytest.raises(ValueError):
+        vectorizer.chunk_text("text", chunk_size=chunk_size, overlap=overlap)
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pytest
+
+from vectorize import QueryCache
+
+SCOPE = "localhost/Documents"
+RESULTS = [{"filename": "a.pdf", "chunk_index": 0, "content": "alpha", "score": 0.9},
+           {"filename": "a.pdf", "chunk_index": 1, "content": "beta", "score": 0.8}]
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "query_cache.npz")
+
+
+def test_near_identical_query_hits(path):
+    cache = QueryCache(path, SCOPE)
+    cache.add(unit(1, 0, 0), 2, RESULTS)
+    assert cache.lookup(unit(1, 0.01, 0), 2) == RESULTS
+    assert cache.lookup(unit(0, 1, 0), 2) is None
+
+
+def test_other_scope_is_not_served(path):
+    cache = QueryCache(path, SCOPE)
+    cache.add(unit(1, 0, 0), 2, RESULTS)
+    cache.save()
+    assert QueryCache(path, "otherhost/Documents").lookup(unit(1, 0, 0), 2) is None
+
+
+def test_smaller_cached_limit_is_not_served(path):
+    cache = QueryCache(path, SCOPE)
+    cache.add(unit(1, 0, 0), 2, RESULTS)
+    assert cache.lookup(unit(1, 0, 0), 1) == RESULTS[:1]
+    assert cache.lookup(unit(1, 0, 0), 3) is None
+
+
+def test_width_mismatch_resets(path):
+    cache = QueryCache(path, SCOPE)
+    cache.add(unit(1, 0, 0), 2, RESULTS)
+    assert cache.lookup(unit(1, 0, 0, 0), 2) is None
+    assert cache.embeddings is None and cache.results == []
+
+    cache.add(unit(1, 0, 0), 2, RESULTS)
+    cache.add(unit(1, 0, 0, 0), 2, RESULTS[:1])
+    assert cache.embeddings.shape == (1, 4)
+    assert cache.results == [RESULTS[:1]]
+
+
+def test_save_load_round_trip(path):
+    cache = QueryCache(path, SCOPE)
+    cache.add(unit(1, 0, 0), 2, RESULTS)
+    cache.add(unit(0, 1, 0), 1, RESULTS[1:])
+    cache.save()
+
+    loaded = QueryCache(path, SCOPE)
+    np.testing.assert_array_equal(loaded.embeddings, cache.embeddings)
+    assert loaded.limits.tolist() == [2, 1]
+    assert loaded.scopes.tolist() == [SCOPE, SCOPE]
+    assert loaded.results == [RESULTS, RESULTS[1:]]
+    assert not loaded.dirty
+
+
+def test_invalidate_keeps_other_scopes(path):
+    other = QueryCache(path, "otherhost/Documents")
+    other.add(unit(0, 1, 0), 2, RESULTS)
+    other.save()
+    cache = QueryCache(path, SCOPE)
+    cache.add(unit(1, 0, 0), 2, RESULTS)
+
+    cache.invalidate()
+    assert cache.scopes.tolist() == ["otherhost/Documents"]
+    assert cache.lookup(unit(1, 0, 0), 2) is None
+
+
+def test_emptied_cache_removes_file(path):
+    cache = QueryCache(path, SCOPE)
+    cache.add(unit(1, 0, 0), 2, RESULTS)
+    cache.save()
+
+    cache = QueryCache(path, SCOPE)
+    cache.invalidate()
+    cache.save()
+    assert not os.path.exists(path)
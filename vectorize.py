@@ -1,25 +1,284 @@
 #!/usr/bin/env python3
+import atexit
+import multiprocessing
 import os
 import sys
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from contextlib import nullcontext
+from functools import lru_cache
+from itertools import chain, groupby
 import weaviate
+from weaviate.classes.aggregate import GroupByAggregate
 from weaviate.classes.config import Configure
 from weaviate.classes.data import DataObject
-import PyPDF2
-from typing import List, Dict
-import hashlib
+from weaviate.util import generate_uuid5
+import json
+import numpy as np
+import tiktoken
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, Union
+import xxhash
+import sqlite3
 from datetime import datetime
 from dotenv import load_dotenv
+from openai import OpenAI
+
+from pdf_pages import extract_pages_from_pdf, iter_pdf_pages, page_count, page_ranges
 
 load_dotenv(override=True)
 
+# Chunks are sized in tokens of the encoding used by text-embedding-3-small.
+CHUNK_ENCODING = "cl100k_base"
+
+# Below this many pages in total, PDFs are extracted serially. Serial
+# extraction runs at roughly 500 pages/s, while starting spawned workers costs
+# over a second (the CLI script is re-imported in each), so a pool only pays
+# off for larger corpora.
+MIN_POOL_PAGES = 2000
+
+# Upper bound on distinct filenames fetched by --resume in one aggregation.
+MAX_INDEXED_FILES = 10000
+
+def default_workers() -> int:
+    """Number of extraction worker processes, leaving one core for uploads."""
+    env_workers = os.getenv("VECTORIZE_WORKERS")
+    if env_workers:
+        try:
+            return max(1, int(env_workers))
+        except ValueError:
+            print(f"Error: VECTORIZE_WORKERS must be an integer, got '{env_workers}'")
+            sys.exit(1)
+    return max(1, (os.cpu_count() or 2) - 1)
+
+@lru_cache(maxsize=None)
+def chunk_encoding() -> tiktoken.Encoding:
+    """Load the chunking tokenizer once per process, on first use."""
+    return tiktoken.get_encoding(CHUNK_ENCODING)
+
+def bounded_map(executor, fn, tasks: Iterable[Tuple], max_pending: int) -> Iterator[Tuple[Tuple, object]]:
+    """Run fn(*task) in the executor, yielding (task, result) in task order.
+
+    Unlike executor.map, at most max_pending tasks are queued ahead of the
+    consumer, so workers keep extracting while the caller uploads without
+    finished results piling up in memory.
+    """
+    pending = deque()
+    for task in tasks:
+        if len(pending) >= max_pending:
+            done_task, future = pending.popleft()
+            yield done_task, future.result()
+        pending.append((task, executor.submit(fn, *task)))
+    while pending:
+        done_task, future = pending.popleft()
+        yield done_task, future.result()
+
+def extract_documents(executor, page_counts: Dict[str, Optional[int]],
+                      max_pending: int) -> Iterator[Iterator[str]]:
+    """Extract PDFs in a process pool, yielding each document's pages in order.
+
+    page_counts maps each PDF path to its page count. PyMuPDF documents
+    cannot be shared between threads, so large files are split by page range
+    and the ranges are spread over worker processes. Each yielded page
+    iterator must be consumed before the next one.
+    """
+    tasks = ((pdf_path, first, last) for pdf_path, pages in page_counts.items()
+             for first, last in page_ranges(pages))
+    results = bounded_map(executor, extract_pages_from_pdf, tasks, max_pending)
+    for _, group in groupby(results, key=lambda item: item[0][0]):
+        yield chain.from_iterable(pages for _, pages in group)
+
+class ChunkCache:
+    """SQLite record of chunks already uploaded to a collection.
+
+    Chunk IDs embed a hash of the chunk content, so a cache hit means the
+    exact same text is already stored and does not need to be re-vectorized.
+    Files whose chunks all uploaded are recorded too, for resuming ingests.
+    """
+
+    def __init__(self, db_path: str, scope: str):
+        self.scope = scope
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_chunks ("
+            "scope TEXT NOT NULL, chunk_id TEXT NOT NULL, PRIMARY KEY (scope, chunk_id))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS completed_files ("
+            "scope TEXT NOT NULL, filename TEXT NOT NULL, PRIMARY KEY (scope, filename))"
+        )
+        rows = self.conn.execute("SELECT chunk_id FROM seen_chunks WHERE scope = ?", (scope,))
+        self.seen = {row[0] for row in rows}
+        rows = self.conn.execute("SELECT filename FROM completed_files WHERE scope = ?", (scope,))
+        self.completed = {row[0] for row in rows}
+
+    def clear(self):
+        """Forget every chunk and file recorded for this scope."""
+        with self.conn:
+            self.conn.execute("DELETE FROM seen_chunks WHERE scope = ?", (self.scope,))
+            self.conn.execute("DELETE FROM completed_files WHERE scope = ?", (self.scope,))
+        self.seen.clear()
+        self.completed.clear()
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.seen
+
+    def add_many(self, chunk_ids: List[str]):
+        """Record successfully uploaded chunk IDs."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen_chunks (scope, chunk_id) VALUES (?, ?)",
+                [(self.scope, chunk_id) for chunk_id in chunk_ids]
+            )
+        self.seen.update(chunk_ids)
+
+    def mark_completed(self, filename: str):
+        """Record that every chunk of a file has been uploaded."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO completed_files (scope, filename) VALUES (?, ?)",
+                (self.scope, filename)
+            )
+        self.completed.add(filename)
+
+    def close(self):
+        self.conn.close()
+
+class QueryCache:
+    """Semantic cache of search results keyed by query embedding.
+
+    A query whose embedding has cosine similarity above the threshold with a
+    previously answered one reuses that answer instead of hitting Weaviate.
+    Entries are scoped by cluster URL and collection like ChunkCache, dropped
+    for a scope when documents are uploaded to it, and persisted with
+    np.savez so they survive between runs.
+    """
+
+    def __init__(self, path: str, scope: str, threshold: float = 0.97,
+                 max_entries: int = 1000, model: str = "text-embedding-3-small"):
+        self.path = path
+        self.scope = scope
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.model = model
+        self.openai = None
+        self._reset()
+        self.dirty = False
+
+        if Path(path).exists():
+            try:
+                with np.load(path) as data:
+                    results = [json.loads(entry) for entry in data["results"]]
+                    if results:
+                        self.embeddings = data["embeddings"]
+                        self.limits = data["limits"]
+                        self.scopes = data["scopes"]
+                        self.results = results
+            except Exception as e:
+                print(f"Ignoring unreadable query cache {path}: {e}")
+
+    def _reset(self):
+        self.embeddings = None
+        self.limits = np.empty(0, dtype=np.int64)
+        self.scopes = np.empty(0, dtype=str)
+        self.results = []
+        self.dirty = True
+
+    def _keep(self, mask: np.ndarray):
+        """Keep only the entries selected by a boolean mask."""
+        if not mask.any():
+            self._reset()
+            return
+        self.embeddings = self.embeddings[mask]
+        self.limits = self.limits[mask]
+        self.scopes = self.scopes[mask]
+        self.results = [entry for entry, keep in zip(self.results, mask) if keep]
+        self.dirty = True
+
+    def embed(self, query: str) -> np.ndarray:
+        """Embed a query as a unit-length vector."""
+        if self.openai is None:
+            self.openai = OpenAI(api_key=os.getenv("OPENAI_APIKEY"))
+        response = self.openai.embeddings.create(model=self.model, input=query)
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def lookup(self, vector: np.ndarray, limit: int) -> Optional[List[Dict]]:
+        """Return cached results for a near-identical query, if any."""
+        if self.embeddings is None:
+            return None
+        if self.embeddings.shape[1] != vector.shape[0]:
+            # Written with a different embedding model; none of it is usable.
+            self._reset()
+            return None
+        sims = self.embeddings @ vector
+        sims[(self.limits < limit) | (self.scopes != self.scope)] = -1.0
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+        return self.results[best][:limit]
+
+    def add(self, vector: np.ndarray, limit: int, results: List[Dict]):
+        """Remember the results of a query, evicting the oldest past max_entries."""
+        if self.embeddings is not None and self.embeddings.shape[1] != vector.shape[0]:
+            self._reset()
+        if self.embeddings is None:
+            self.embeddings = vector[np.newaxis, :]
+        else:
+            self.embeddings = np.vstack([self.embeddings, vector])[-self.max_entries:]
+        self.limits = np.append(self.limits, limit)[-self.max_entries:]
+        self.scopes = np.append(self.scopes, self.scope)[-self.max_entries:]
+        self.results = (self.results + [results])[-self.max_entries:]
+        self.dirty = True
+
+    def invalidate(self):
+        """Drop the entries of this scope, e.g. after new chunks were uploaded."""
+        if self.embeddings is not None and (self.scopes == self.scope).any():
+            self._keep(self.scopes != self.scope)
+
+    def save(self):
+        """Write the cache to disk if it changed."""
+        if not self.dirty:
+            return
+        if self.embeddings is None:
+            if Path(self.path).exists():
+                os.remove(self.path)
+        else:
+            with open(self.path, "wb") as file:
+                np.savez(file, embeddings=self.embeddings, limits=self.limits, scopes=self.scopes,
+                         results=np.array([json.dumps(entry) for entry in self.results]))
+        self.dirty = False
+
 class DocumentVectorizer:
-    def __init__(self, weaviate_url: str, api_key: str = None):
+    _shared: Dict[Tuple[str, Optional[str], Optional[str]], "DocumentVectorizer"] = {}
+
+    def __init__(self, weaviate_url: str, api_key: str = None, query_cache_path: str = None):
         """Initialize the document vectorizer with Weaviate connection."""
         self.weaviate_url = weaviate_url
         self.api_key = api_key
         self.client = None
         self.collection_name = "Documents"
+        self.query_cache = QueryCache(query_cache_path, f"{weaviate_url}/{self.collection_name}") \
+            if query_cache_path else None
+
+    @classmethod
+    def shared(cls, weaviate_url: str, api_key: str = None,
+               query_cache_path: str = None) -> "DocumentVectorizer":
+        """Return a connected vectorizer reused across calls in this process.
+
+        Repeated searches skip the connection handshake and auth setup; the
+        connection is closed when the interpreter exits. Each query cache
+        file gets its own instance.
+        """
+        key = (weaviate_url, api_key, query_cache_path)
+        instance = cls._shared.get(key)
+        if instance is None:
+            instance = cls(weaviate_url, api_key, query_cache_path)
+            cls._shared[key] = instance
+            atexit.register(instance.close)
+        if instance.client is None:
+            instance.connect()
+        return instance
 
     def connect(self):
         """Connect to Weaviate cluster."""
@@ -67,48 +326,106 @@ class DocumentVectorizer:
 
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text from PDF file."""
+        return "".join(iter_pdf_pages(pdf_path))
+
+    def chunk_text(self, text: Union[str, Iterable[str]], chunk_size: int = 800,
+                   overlap: int = 100) -> Iterator[str]:
+        """Split text into overlapping chunks of chunk_size tokens.
+
+        Tokenization uses tiktoken with the embedding model's encoding, so
+        chunk sizes match what the vectorizer is billed for. text may also be
+        an iterable of pieces (e.g. PDF pages); tokens are fed through a
+        rolling buffer and chunks are yielded as soon as they are complete.
+        """
+        if chunk_size <= 0 or not 0 <= overlap < chunk_size:
+            raise ValueError(
+                f"chunk_size must be positive and overlap in [0, chunk_size), "
+                f"got chunk_size={chunk_size}, overlap={overlap}"
+            )
+        pieces = [text] if isinstance(text, str) else text
+        return self._iter_chunks(pieces, chunk_size, overlap)
+
+    def _iter_chunks(self, pieces: Iterable[str], chunk_size: int, overlap: int) -> Iterator[str]:
+        encoding = chunk_encoding()
+        step = chunk_size - overlap
+        tokens = []
+
+        for piece in pieces:
+            tokens.extend(encoding.encode_ordinary(piece))
+            while len(tokens) > chunk_size:
+                chunk = self._decode_chunk(encoding, tokens[:chunk_size])
+                if chunk:
+                    yield chunk
+                del tokens[:step]
+
+        if tokens:
+            chunk = self._decode_chunk(encoding, tokens)
+            if chunk:
+                yield chunk
+
+    def _decode_chunk(self, encoding: tiktoken.Encoding, tokens: List[int]) -> str:
+        """Decode a token window, dropping UTF-8 sequences cut at its edges."""
+        return encoding.decode_bytes(tokens).decode("utf-8", errors="ignore").strip()
+
+    def generate_chunk_id(self, filename: str, chunk_index: int,
+                          chunk_text: Union[str, bytes]) -> str:
+        """Generate unique ID for each chunk.
+
+        The content hash is a non-cryptographic xxh3 fingerprint, which is
+        much cheaper than MD5 for large chunk counts. Callers that already
+        hold the UTF-8 encoded chunk can pass the bytes to skip re-encoding.
+        """
+        if isinstance(chunk_text, str):
+            chunk_text = chunk_text.encode()
+        content_hash = xxhash.xxh3_64_hexdigest(chunk_text)[:8]
+        return f"{filename}_{chunk_index}_{content_hash}"
+
+    def object_count(self, collection) -> int:
+        """Return the number of objects in the collection, or 0 if unknown."""
         try:
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page_num, page in enumerate(reader.pages):
-                    text += f"\n--- Page {page_num + 1} ---\n"
-                    text += page.extract_text()
-                return text
+            return collection.aggregate.over_all(total_count=True).total_count or 0
         except Exception as e:
-            print(f"Failed to extract text from {pdf_path}: {e}")
-            return ""
-
-    def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 100) -> List[str]:
-        """Split text into overlapping chunks."""
-        chunks = []
-        start = 0
-
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
-
-            if end < len(text):
-                last_space = chunk.rfind(' ')
-                if last_space != -1:
-                    chunk = chunk[:last_space]
-                    end = start + last_space
-
-            chunks.append(chunk.strip())
-            start = end - overlap
+            print(f"Failed to count objects in '{self.collection_name}': {e}")
+            return 0
 
-            if start >= len(text):
-                break
+    def indexed_filenames(self, collection) -> set:
+        """Return the filenames that have chunks in the collection.
 
-        return [chunk for chunk in chunks if chunk]
-
-    def generate_chunk_id(self, filename: str, chunk_index: int, chunk_text: str) -> str:
-        """Generate unique ID for each chunk."""
-        content_hash = hashlib.md5(chunk_text.encode()).hexdigest()[:8]
-        return f"{filename}_{chunk_index}_{content_hash}"
-
-    def process_documents(self, assets_dir: str = "assets"):
-        """Process all PDF documents in the assets directory."""
+        Uses a single aggregation grouped by filename rather than per-chunk
+        lookups.
+        """
+        try:
+            response = collection.aggregate.over_all(
+                group_by=GroupByAggregate(prop="filename", limit=MAX_INDEXED_FILES)
+            )
+            if len(response.groups) >= MAX_INDEXED_FILES:
+                print(f"Warning: listing indexed files stopped at {MAX_INDEXED_FILES}; "
+                      f"some indexed PDFs may be processed again")
+            return {group.grouped_by.value for group in response.groups}
+        except Exception as e:
+            print(f"Failed to list indexed files, processing all: {e}")
+            return set()
+
+    def process_documents(self, assets_dir: str = "assets", workers: int = None,
+                          batch_size: int = 100, concurrent_requests: int = 2,
+                          cache_path: str = None, resume: bool = False):
+        """Process all PDF documents in the assets directory.
+
+        Pages are streamed through chunking into the upload batch without
+        building a full-document string. Text extraction runs in a process
+        pool when more than one worker is used and the PDFs have at least
+        MIN_POOL_PAGES pages, with large files split by page range across
+        workers; uploads stay on the main process so only one Weaviate
+        connection is used, and chunks are sent in fixed-size batches with a
+        bounded number of requests in flight.
+        If cache_path is given, chunks recorded there as already uploaded are
+        skipped so they are not sent to the vectorizer again; the cache is
+        cleared when the collection is found empty. It cannot detect objects
+        deleted from a non-empty collection, so it is opt-in. With resume,
+        files the cache records as fully uploaded are skipped; without a
+        cache, any file with chunks in the collection is skipped, including
+        one whose upload was cut short.
+        """
         assets_path = Path(assets_dir)
         if not assets_path.exists():
             print(f"Assets directory '{assets_dir}' not found")
@@ -119,56 +436,156 @@ class DocumentVectorizer:
             print(f"No PDF files found in '{assets_dir}'")
             return
 
-        print(f"Found {len(pdf_files)} PDF files to process")
-
         collection = self.client.collections.get(self.collection_name)
-        total_chunks = 0
 
-        for pdf_file in pdf_files:
-            print(f"Processing: {pdf_file.name}")
-
-            text = self.extract_text_from_pdf(str(pdf_file))
-            if not text:
-                continue
-
-            chunks = self.chunk_text(text)
-            print(f"  Generated {len(chunks)} chunks")
+        cache = ChunkCache(cache_path, f"{self.weaviate_url}/{self.collection_name}") if cache_path else None
+        if cache and (cache.seen or cache.completed) and self.object_count(collection) == 0:
+            # The collection was dropped, recreated or wiped since the cache
+            # was written, so none of the recorded chunks exist any more.
+            print("Collection is empty, clearing the chunk cache")
+            cache.clear()
+
+        if resume:
+            indexed = cache.completed if cache else self.indexed_filenames(collection)
+            pdf_files = [pdf_file for pdf_file in pdf_files if pdf_file.name not in indexed]
+            if not pdf_files:
+                print(f"All PDF files in '{assets_dir}' are already indexed")
+                if cache:
+                    cache.close()
+                return
 
-            batch_data = []
-            for i, chunk in enumerate(chunks):
-                if not chunk.strip():
-                    continue
+        print(f"Found {len(pdf_files)} PDF files to process")
 
-                chunk_id = self.generate_chunk_id(pdf_file.stem, i, chunk)
+        if self.query_cache:
+            # Cached answers predate the chunks about to be uploaded and may
+            # be wrong once they land. They are dropped and saved up front so
+            # an ingest that fails part way does not leave them behind.
+            self.query_cache.invalidate()
+            self.query_cache.save()
 
-                data_object = {
-                    "filename": pdf_file.name,
-                    "chunk_index": i,
-                    "content": chunk,
-                    "file_path": str(pdf_file),
-                    "processed_at": datetime.now().isoformat(),
-                    "chunk_id": chunk_id
-                }
-                batch_data.append(data_object)
+        total_chunks = 0
 
-            if batch_data:
-                try:
-                    collection.data.insert_many(batch_data)
-                    total_chunks += len(batch_data)
-                    print(f"  Uploaded {len(batch_data)} chunks")
-                except Exception as e:
-                    print(f"  Failed to upload chunks: {e}")
+        workers = workers or default_workers()
+        page_counts = {}
+        if workers > 1:
+            page_counts = {str(pdf_file): page_count(str(pdf_file)) for pdf_file in pdf_files}
+            if sum(pages or 0 for pages in page_counts.values()) < MIN_POOL_PAGES:
+                workers = 1
+        # A single worker streams pages straight from the file; a pool hands
+        # documents back as lists of page texts, in page-range pieces. Workers
+        # are spawned rather than forked: by the first submit the batch has
+        # started its background threads on a live gRPC channel, and forking
+        # a multi-threaded gRPC process can deadlock.
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) \
+            if workers > 1 else nullcontext()
+        errors_seen = 0
+        try:
+            with pool as executor, \
+                    collection.batch.fixed_size(batch_size=batch_size,
+                                                concurrent_requests=concurrent_requests) as batch:
+                if executor:
+                    documents = extract_documents(executor, page_counts, max_pending=2 * workers)
+                else:
+                    documents = map(iter_pdf_pages, map(str, pdf_files))
+
+                for pdf_file, pages in zip(pdf_files, documents):
+                    # Fields shared by every chunk of the file; each chunk's
+                    # properties dict is this plus its own three fields.
+                    file_properties = {
+                        "filename": pdf_file.name,
+                        "file_path": str(pdf_file),
+                        "processed_at": datetime.now().isoformat(),
+                    }
+                    file_stem = pdf_file.stem
+                    print(f"Processing: {pdf_file.name}")
+
+                    queued = 0
+                    file_ids = []
+                    cached = 0
+                    duplicates = 0
+                    seen_hashes = set()
+                    for i, chunk in enumerate(self.chunk_text(pages)):
+                        # Repeated headers, footers and TOC lines would each cost an
+                        # embedding; chunk_index keeps the pre-dedup position.
+                        chunk_bytes = chunk.encode()
+                        content_hash = xxhash.xxh3_64_intdigest(chunk_bytes)
+                        if content_hash in seen_hashes:
+                            duplicates += 1
+                            continue
+                        seen_hashes.add(content_hash)
+
+                        chunk_id = self.generate_chunk_id(file_stem, i, chunk_bytes)
+                        if cache and chunk_id in cache:
+                            cached += 1
+                            continue
+
+                        uuid = generate_uuid5(chunk_id)
+                        batch.add_object(
+                            properties={**file_properties, "chunk_index": i, "content": chunk, "chunk_id": chunk_id},
+                            uuid=uuid
+                        )
+                        if cache:
+                            file_ids.append(chunk_id)
+                        queued += 1
+
+                    total_chunks += queued
+                    print(f"  Queued {queued} chunks for upload")
+                    if cached:
+                        print(f"  Skipped {cached} chunks already uploaded")
+                    if duplicates:
+                        print(f"  Skipped {duplicates} duplicate chunks")
+
+                    if cache:
+                        # Record the file's chunks as soon as they are stored, so
+                        # an ingest that dies later keeps what already uploaded.
+                        # The batch only says how many objects failed, not which,
+                        # so a file with failures is left for the next run.
+                        batch.flush()
+                        if batch.number_errors == errors_seen:
+                            cache.add_many(file_ids)
+                            cache.mark_completed(pdf_file.name)
+                        else:
+                            print(f"  {batch.number_errors - errors_seen} chunks failed to upload; "
+                                  f"not recording this file in the chunk cache")
+                            errors_seen = batch.number_errors
+        finally:
+            if cache:
+                cache.close()
+
+        # Object UUIDs are derived from chunk IDs, so re-ingesting an unchanged
+        # chunk replaces its existing object in place rather than adding a
+        # duplicate. It is still uploaded (and re-vectorized) each time.
+        failed_objects = collection.batch.failed_objects
+        if failed_objects:
+            print(f"Failed to upload {len(failed_objects)} chunks: {failed_objects[0].message}")
+            total_chunks -= len(failed_objects)
 
         print(f"Total chunks processed: {total_chunks}")
 
     def search_documents(self, query: str, limit: int = 5):
-        """Search for documents using vector similarity."""
+        """Search for documents using vector similarity.
+
+        With a query cache, near-duplicate queries are answered locally.
+        """
+        query_vector = None
+        if self.query_cache:
+            try:
+                query_vector = self.query_cache.embed(query)
+                cached = self.query_cache.lookup(query_vector, limit)
+                if cached is not None:
+                    return cached
+            except Exception as e:
+                print(f"Query cache unavailable: {e}")
+
         try:
             collection = self.client.collections.get(self.collection_name)
 
+            # Only the fields shown in results are transferred; file_path,
+            # processed_at and chunk_id stay on the server.
             response = collection.query.near_text(
                 query=query,
                 limit=limit,
+                return_properties=["filename", "chunk_index", "content"],
                 return_metadata=weaviate.classes.query.MetadataQuery(score=True)
             )
 
@@ -177,32 +594,53 @@ class DocumentVectorizer:
                 results.append({
                     "filename": obj.properties.get("filename"),
                     "chunk_index": obj.properties.get("chunk_index"),
-                    "content": obj.properties.get("content")[:200] + "...",
+                    "content": (obj.properties.get("content") or "")[:200] + "...",
                     "score": obj.metadata.score
                 })
 
+            if query_vector is not None:
+                try:
+                    self.query_cache.add(query_vector, limit, results)
+                except Exception as e:
+                    print(f"Failed to update query cache: {e}")
             return results
         except Exception as e:
             print(f"Search failed: {e}")
             return []
 
     def close(self):
-        """Close Weaviate connection."""
+        """Close Weaviate connection and persist the query cache."""
+        if self.query_cache:
+            self.query_cache.save()
         if self.client:
             self.client.close()
+            self.client = None
 
 def main():
     """Main function to run the document vectorizer."""
     import argparse
 
-    load_dotenv()
-
     parser = argparse.ArgumentParser(description="Vectorize documents for Weaviate")
     parser.add_argument("--url", default="ijn82ys1to6m0nm7ogs4na.c0.europe-west3.gcp.weaviate.cloud",
                        help="Weaviate cluster URL")
     parser.add_argument("--assets-dir", default="assets", help="Directory containing PDF files")
     parser.add_argument("--search", help="Search query to test the system")
     parser.add_argument("--create-schema", action="store_true", help="Create the schema only")
+    parser.add_argument("--workers", type=int,
+                       help="PDF extraction worker processes (default: VECTORIZE_WORKERS or CPU count - 1)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Chunks per upload batch")
+    parser.add_argument("--concurrent-requests", type=int, default=2,
+                       help="Upload batches sent to Weaviate in parallel")
+    parser.add_argument("--cache-db", default=os.getenv("VECTORIZE_CACHE_DB"),
+                       help="SQLite file recording uploaded chunks, which later runs skip "
+                            "(e.g. .chunk_cache.sqlite; env: VECTORIZE_CACHE_DB)")
+    parser.add_argument("--query-cache", default=os.getenv("VECTORIZE_QUERY_CACHE", ".query_cache.npz"),
+                       help="File caching search results by query embedding (env: VECTORIZE_QUERY_CACHE)")
+    parser.add_argument("--no-query-cache", action="store_true",
+                       help="Always run searches against Weaviate")
+    parser.add_argument("--resume", action="store_true",
+                       help="Skip PDFs already fully uploaded, as recorded in --cache-db; without a "
+                            "cache, skip any PDF with chunks in the collection, even a partly uploaded one")
 
     args = parser.parse_args()
 
@@ -220,21 +658,30 @@ def main():
 
     os.environ["OPENAI_APIKEY"] = openai_key
 
-    vectorizer = DocumentVectorizer(args.url, api_key)
+    # --create-schema takes precedence over --search, which takes precedence
+    # over ingesting.
+    if args.search and not args.create_schema:
+        vectorizer = DocumentVectorizer.shared(
+            args.url, api_key, None if args.no_query_cache else args.query_cache)
+        results = vectorizer.search_documents(args.search)
+        print(f"Search results for '{args.search}':")
+        for i, result in enumerate(results, 1):
+            print(f"{i}. {result['filename']} (chunk {result['chunk_index']}) - Score: {result['score']:.4f}")
+            print(f"   {result['content']}\n")
+        return
+
+    # Ingests always see the query cache, so uploads can invalidate it.
+    vectorizer = DocumentVectorizer(args.url, api_key, args.query_cache)
     vectorizer.connect()
 
     try:
-        if args.create_schema:
-            vectorizer.create_schema()
-        elif args.search:
-            results = vectorizer.search_documents(args.search)
-            print(f"Search results for '{args.search}':")
-            for i, result in enumerate(results, 1):
-                print(f"{i}. {result['filename']} (chunk {result['chunk_index']}) - Score: {result['score']:.4f}")
-                print(f"   {result['content']}\n")
-        else:
-            vectorizer.create_schema()
-            vectorizer.process_documents(args.assets_dir)
+        vectorizer.create_schema()
+        if not args.create_schema:
+            vectorizer.process_documents(args.assets_dir, workers=args.workers,
+                                         batch_size=args.batch_size,
+                                         concurrent_requests=args.concurrent_requests,
+                                         cache_path=args.cache_db,
+                                         resume=args.resume)
 
     finally:
         vectorizer.close()